@@ -3,17 +3,30 @@ import os
 import sys
 import json
 import time
+import hashlib
+import random
+import logging
+import functools
 import asyncio
 import re
-from mutagen.easyid3 import EasyID3
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from mutagen.mp3 import MP3
-from mutagen.id3 import ID3, POPM
+from mutagen.id3 import ID3, POPM, TCON, TPE1, TDRC
 from tqdm import tqdm
 from google import genai
+from google.genai import types
 from pyrekordbox import Rekordbox6Database
 from pyrekordbox.db6 import tables
+from sqlalchemy import Integer, cast, func, text
 from dotenv import load_dotenv
 
+# Optional: faster JSON serialization for the state files (falls back to stdlib)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -29,6 +42,8 @@ MUSIC_DIR = os.getenv("MUSIC_DIR", r"C:\Path\To\Your\Music\Library")  # Set via
 BITRATE_MIN = 320_000
 ENERGY_MAP_PATH = "energy_map.json"
 PROCESSED_SONGS_PATH = "processed_songs.json"
+PROCESSED_SONGS_LOG_PATH = "processed_songs.log"  # Append-only JSONL ledger, folded into the JSON at shutdown
+GEMINI_CACHE_PATH = "gemini_cache.json"  # Raw Gemini response blocks keyed by (title, artist) - makes re-runs free
 GENAI_API_KEY = os.getenv("GENAI_API_KEY", "")  # Get your free API key from https://aistudio.google.com/apikey
 
 # SoundCloud API (optional - for accurate genre tagging from SoundCloud)
@@ -40,8 +55,22 @@ SOUNDCLOUD_AUTH_TOKEN = os.getenv("SOUNDCLOUD_AUTH_TOKEN", "")  # Format: "OAuth
 # API Rate Limiting (Gemini free tier: 10 requests per minute)
 API_DELAY_SECONDS = 7  # Delay between requests (7 seconds = ~8.5 requests/minute, safe margin)
 MAX_RETRIES = 5  # Number of retries for rate limit errors
+BACKOFF_BASE_SECONDS = 2  # First-retry backoff; doubles per attempt
+BACKOFF_CAP_SECONDS = 120  # Ceiling for exponential backoff
 RETRY_BASE_DELAY = 60  # Base delay for exponential backoff on 429 errors
 
+# Parallel metadata-scan threads (MP3 header reads are I/O-bound; lower to ~8 for spinning disks)
+SCAN_WORKERS = 32
+
+# Songs per Gemini request - batching amortizes the rate-limit delay across
+# several songs (a batch of 5 needs one 7-second slot instead of five)
+GEMINI_BATCH_SIZE = 5
+
+# Rekordbox tracks per database commit - each commit fsyncs the SQLite file,
+# so batching cuts disk syncs by this factor (tail is flushed at the end)
+BATCH_COMMIT_SIZE = 50
+COMMIT_INTERVAL_SECONDS = 5  # Also commit when this much time has passed since the last one
+
 
 # Initialize new Google GenAI client (latest SDK)
 client = genai.Client(api_key=GENAI_API_KEY)
@@ -55,6 +84,10 @@ if soundcloud_enabled:
     except ImportError:
         soundcloud_enabled = False
 
+# Bump when PROMPT_INSTRUCTIONS changes materially - stale cached responses
+# from an older prompt format are then ignored instead of parsed wrong
+PROMPT_VERSION = 1
+
 PROMPT_INSTRUCTIONS = """You are a music metadata assistant for DJ music libraries. CRITICAL: Identify the genre based on the REMIXER'S/PRODUCER'S typical style and how they tag their own releases, not just the original song's genre.
 
 IMPORTANT ARTIST/PRODUCER GENRE KNOWLEDGE:
@@ -88,98 +121,334 @@ GENRE GUIDELINES - READ CAREFULLY:
   * Fast-paced + breakbeats = "Drum & Bass" or "Jungle"
   * Synthesized beats + rap vocals = "Hip-Hop" or "Trap"
 
-After each song prompt, only respond strictly in this format:
-Is Remix: <ONLY respond with "Yes" or "No". "Yes" if the title contains remix/edit/bootleg/flip/VIP/rework/refix indicators OR remixer names in parentheses. "No" if it's the original version>
-Genre: <use PRECISE DJ/music pool genre names. For REMIXES: use the REMIXER'S genre style. For ORIGINALS: use the original song's genre. BE SPECIFIC - avoid vague umbrella terms! Common genres: "Tech House", "Afro House", "Afro", "Progressive House", "Electro House", "Future Bass", "Bass House", "French House", "Trap", "Hip-Hop", "R&B", "Pop", "K-Pop", "Dance-Pop", "Dubstep", "Drum & Bass", "House", "Deep House", "Techno", "Trance", "Hardstyle", "UK Garage", "Jersey Club", "Jersey", "Afrobeats", "Reggae", "Reggaeton", "Moombahton", "Big Room", "Mainstage", "Festival House", "Funky House", "Disco House", "Nu Disco", "Tropical House", "Speed House", "Ghetto House", "Circuit House", "Club House", "Melbourne Bounce", "Psytrance", "Acid House", "Breakbeat", "Breaks", "Organic House", "Melodic House", "Country", "Disco", "Funk", etc. If multiple genres apply, use "/" to separate them like "Afro House / Melodic House">
-Original Artists: <main artist and any featured artists, comma delimited>
-Original Song Release: <year of release of the ORIGINAL song, not the remix>
-Situation: <ONLY respond with "Bar", "Club", or "Both" - nothing else. Use "Bar" for laid-back/moderate energy tracks, "Club" for high-energy dance tracks, "Both" if it works in either setting>
-Commercial Friendly: <ONLY respond with "Yes" or "No". "Yes" if the song has clean lyrics (no explicit content, profanity, or controversial themes) and is appropriate for commercial venues like restaurants, retail stores, corporate events, or radio. "No" if it contains explicit content, profanity, or adult themes>
+Each prompt lists one or more numbered songs ("Song 1:", "Song 2:", ...). Respond with a JSON array containing EXACTLY one object per song, where:
+- song_number: the number from the matching "Song <number>:" line in the prompt
+- is_remix: true if the title contains remix/edit/bootleg/flip/VIP/rework/refix indicators OR remixer names in parentheses, false if it's the original version
+- genre: use PRECISE DJ/music pool genre names. For REMIXES: use the REMIXER'S genre style. For ORIGINALS: use the original song's genre. BE SPECIFIC - avoid vague umbrella terms! Common genres: "Tech House", "Afro House", "Afro", "Progressive House", "Electro House", "Future Bass", "Bass House", "French House", "Trap", "Hip-Hop", "R&B", "Pop", "K-Pop", "Dance-Pop", "Dubstep", "Drum & Bass", "House", "Deep House", "Techno", "Trance", "Hardstyle", "UK Garage", "Jersey Club", "Jersey", "Afrobeats", "Reggae", "Reggaeton", "Moombahton", "Big Room", "Mainstage", "Festival House", "Funky House", "Disco House", "Nu Disco", "Tropical House", "Speed House", "Ghetto House", "Circuit House", "Club House", "Melbourne Bounce", "Psytrance", "Acid House", "Breakbeat", "Breaks", "Organic House", "Melodic House", "Country", "Disco", "Funk", etc. If multiple genres apply, use "/" to separate them like "Afro House / Melodic House"
+- original_artists: main artist and any featured artists, comma delimited
+- original_song_release: year of release of the ORIGINAL song, not the remix
+- situation: ONLY "Bar", "Club", or "Both" - nothing else. Use "Bar" for laid-back/moderate energy tracks, "Club" for high-energy dance tracks, "Both" if it works in either setting
+- commercial_friendly: ONLY "Yes" or "No". "Yes" if the song has clean lyrics (no explicit content, profanity, or controversial themes) and is appropriate for commercial venues like restaurants, retail stores, corporate events, or radio. "No" if it contains explicit content, profanity, or adult themes
 """
 
+# Response schema enforced via Gemini structured output: the API then
+# guarantees a valid JSON array with one object per song, so parsing never
+# has to recover from free-text formatting drift
+GEMINI_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "song_number": {"type": "INTEGER"},
+            "is_remix": {"type": "BOOLEAN"},
+            "genre": {"type": "STRING"},
+            "original_artists": {"type": "STRING"},
+            "original_song_release": {"type": "STRING"},
+            "situation": {"type": "STRING", "enum": ["Bar", "Club", "Both"]},
+            "commercial_friendly": {"type": "STRING", "enum": ["Yes", "No"]},
+        },
+        "required": [
+            "song_number", "is_remix", "genre", "original_artists",
+            "original_song_release", "situation", "commercial_friendly",
+        ],
+    },
+}
+
+# -------------------- LOGGING --------------------
+class TqdmLoggingHandler(logging.Handler):
+    """Emit log records via tqdm.write so per-track messages don't tear the progress bar."""
+    def emit(self, record):
+        try:
+            tqdm.write(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+# Per-track messages go through this logger; one-off startup/summary output
+# stays on print since no progress bar is live then
+logger = logging.getLogger("autotag")
+logger.addHandler(TqdmLoggingHandler())
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+SUMMARY_SAMPLE_LIMIT = 50  # Issue entries kept for the summary; the rest are only counted
+
+class IssueLog:
+    """
+    Bounded issue list for the end-of-run summary. Keeps the first
+    SUMMARY_SAMPLE_LIMIT entries and counts the rest, so a huge library full
+    of failures doesn't hold every record in memory for the whole run.
+    Quacks enough like a list (append/len/iter/bool) for the existing call sites.
+    """
+    def __init__(self):
+        self.items = []
+        self.total = 0
+
+    def append(self, item):
+        self.total += 1
+        if len(self.items) < SUMMARY_SAMPLE_LIMIT:
+            self.items.append(item)
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __bool__(self):
+        return self.total > 0
+
+    @property
+    def overflow(self):
+        """How many entries were counted but not retained."""
+        return self.total - len(self.items)
+
+# -------------------- COMPILED PATTERNS --------------------
+# Compiled once at import time - these run on every file in the library,
+# so avoid re.search's per-call cache lookup and flag parsing.
+_REMIX_KEYWORDS = r'(?:Remix|Edit|Bootleg|Flip|VIP|Rework|Refix|Mix)'
+# Matches "(Name Remix)" and "[Name Remix]" in one scan instead of two
+_REMIX_TAG_RE = re.compile(rf'[\(\[]([^)\]]+?)\s+{_REMIX_KEYWORDS}[\)\]]', re.IGNORECASE)
+_DJ_PREFIX_RE = re.compile(r'^(?:DJ\s+|dj\s+)')
+_TRANSITION_RE = re.compile(r'\b(\d{2,3})-(\d{2,3})\b')
+_RETRY_DELAY_RE = re.compile(r"'retryDelay':\s*'([\d.]+)s'")
+_SONG_BLOCK_RE = re.compile(r'^\s*(?:\*+\s*)?Song\s+(\d+)\s*:', re.IGNORECASE | re.MULTILINE)
+# Local remix hint: a bare keyword ("Song X Remix") without the bracketed tag
+# _REMIX_TAG_RE requires - lets us override a Gemini "No" that the title contradicts
+_IS_REMIX_RE = re.compile(rf'\b{_REMIX_KEYWORDS}\b', re.IGNORECASE)
+# Vague single-word genres and forbidden compound patterns for validate_genre
+_VAGUE_GENRES = frozenset(["edm", "dance", "electronic", "club music", "music"])
+# Token prefilter for the compound check: _FORBIDDEN_COMPOUND_RE can only
+# match when this finds at least two hits, so most genres skip the
+# backtracking sweep entirely. Word-boundary matching so punctuation-joined
+# compounds ("Dance-Electronic") count exactly as the compound regex sees them
+_VAGUE_TOKEN_RE = re.compile(r'\b(?:dance|edm|electronic)\b')
+_FORBIDDEN_COMPOUND_RE = re.compile(r'\b(dance|edm|electronic)\b.*\b(dance|edm|electronic)\b')  # "Dance & EDM" etc.
+_FORBIDDEN_SUFFIX_RE = re.compile(r'\b(?:edit|mix|remix)\b$')  # "Edit"/"Mix"/"Remix" as the trailing word
+# "club mix", "club version", "club edit", "club remix" in one alternation
+_CLUB_MIX_RE = re.compile(r'\bclub\s+(?:mix|version|edit|remix)\b', re.IGNORECASE)
+
 # -------------------- UTILITIES --------------------
 def load_json(path):
     if os.path.exists(path):
+        if orjson is not None:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     return {}
 
 def save_json(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Compact separators: the files we write (processed_songs.json) are
+    # machine-read and rewritten often, so skip pretty-print overhead.
+    # orjson emits compact bytes directly and is several times faster.
+    if orjson is not None:
+        payload = orjson.dumps(data)
+    else:
+        payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    # Write-then-rename so a crash mid-write can't truncate the state file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+def load_processed_songs():
+    """
+    Load processed songs from the compact JSON plus the append-only log.
+    The log holds titles recorded since the last clean shutdown; replaying it
+    keeps crash recovery intact without rewriting the whole dict per song.
+    """
+    processed = load_json(PROCESSED_SONGS_PATH)
+    if os.path.exists(PROCESSED_SONGS_LOG_PATH):
+        with open(PROCESSED_SONGS_LOG_PATH, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    processed.update(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # torn write from a crash - skip the partial line
+    return processed
+
+# Kept open for the whole run: line buffering flushes each entry to the OS
+# without reopening the file per song
+_processed_log_fh = None
+
+def append_processed_song(title, entry=True):
+    """Record one processed title in the JSONL log (O(1) vs a full rewrite)."""
+    global _processed_log_fh
+    if _processed_log_fh is None:
+        _processed_log_fh = open(PROCESSED_SONGS_LOG_PATH, "a", encoding="utf-8", buffering=1)
+    _processed_log_fh.write(json.dumps({title: entry}, ensure_ascii=False) + "\n")
+
+def compact_processed_songs(processed_songs):
+    """Fold the append-only log back into the compact JSON file."""
+    global _processed_log_fh
+    if _processed_log_fh is not None:
+        _processed_log_fh.close()
+        _processed_log_fh = None
+    save_json(PROCESSED_SONGS_PATH, processed_songs)
+    if os.path.exists(PROCESSED_SONGS_LOG_PATH):
+        os.remove(PROCESSED_SONGS_LOG_PATH)
+
+def iter_mp3_files(root_dir):
+    """
+    Recursively yield full paths of .mp3 files under root_dir using os.scandir.
+    Faster than os.walk for large libraries: DirEntry caches stat info and we
+    skip building name lists for non-MP3 siblings (artwork, .cue files, etc.).
+    """
+    stack = [root_dir]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(".mp3") and entry.is_file(follow_symlinks=False):
+                        yield entry.path
+        except OSError:
+            continue
 
-def get_bitrate(file_path):
+# MPEG1 Layer III bitrate table in kbps (header bitrate-index 0-14)
+_MP3_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+
+def quick_bitrate(full_path):
+    """
+    Read the bitrate from the first MPEG frame header without a full parse.
+    Skips the ID3v2 block via its syncsafe size field, then decodes the
+    bitrate index from the first frame header - a few hundred bytes of I/O
+    instead of mutagen walking every tag frame.
+    Returns bitrate in bps, or None when the header can't be trusted (VBR
+    file with a Xing header, unusual layout) so callers fall back to MP3().
+    """
     try:
-        audio = MP3(file_path)
-        return audio.info.bitrate
-    except Exception:
-        return 0
+        with open(full_path, "rb", buffering=4096) as fh:
+            header = fh.read(10)
+            if len(header) < 10:
+                return None
+
+            # Skip the ID3v2 block using its syncsafe size (bytes 6-9)
+            if header[:3] == b"ID3":
+                tag_size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+                fh.seek(10 + tag_size)
+            else:
+                fh.seek(0)
+
+            # Find the frame sync within a small window (tolerates padding/junk)
+            chunk = fh.read(4096)
+            for i in range(len(chunk) - 4):
+                if chunk[i] == 0xFF and (chunk[i + 1] & 0xE0) == 0xE0:
+                    version = (chunk[i + 1] >> 3) & 0x03
+                    layer = (chunk[i + 1] >> 1) & 0x03
+                    bitrate_index = (chunk[i + 2] >> 4) & 0x0F
+
+                    # Only trust MPEG1 Layer III frames with a valid bitrate index
+                    if version != 0x03 or layer != 0x01 or not 0 < bitrate_index < 15:
+                        return None
+
+                    # A Xing/Info tag after the side info means VBR/LAME header -
+                    # the first frame's nominal bitrate is meaningless then
+                    if b"Xing" in chunk[i:i + 200] or b"Info" in chunk[i:i + 200]:
+                        return None
+
+                    return _MP3_BITRATES[bitrate_index] * 1000
+            return None
+    except OSError:
+        return None
+
+def scan_mp3_file(full_path, fingerprints=None):
+    """
+    Read bitrate, title and artist from an MP3 with minimal I/O.
+    Returns (bitrate, title_or_None, artist_or_None), or (None, None, None)
+    for a file whose (mtime_ns, size) fingerprint matches a previous
+    successful run - those are skipped on a single stat() without opening
+    the file at all. Otherwise tries the header-only quick_bitrate() first
+    so low-bitrate rejects never pay for a full parse; files that pass (or
+    can't be quick-checked) get one MP3 parse that serves the final bitrate
+    and both tags - the main loop then never reopens the file for the artist.
+    """
+    if fingerprints:
+        entry = fingerprints.get(full_path)
+        if entry:
+            try:
+                st = os.stat(full_path)
+                if (entry.get("mtime_ns") == st.st_mtime_ns
+                        and entry.get("size") == st.st_size):
+                    return None, None, None
+            except OSError:
+                pass
+
+    bitrate = quick_bitrate(full_path)
+    if bitrate is not None and bitrate < BITRATE_MIN:
+        return bitrate, None, None
 
-def get_artist_from_file(file_path):
-    """Extract artist from MP3 file metadata only (no fallback to filename)."""
     try:
-        audio = EasyID3(file_path)
-        artist = audio.get('artist', [''])[0]
-        return artist if artist else None
+        with open(full_path, "rb", buffering=65536) as fh:
+            audio = MP3(fh)
+        bitrate = audio.info.bitrate
+        title_frame = audio.tags.get("TIT2") if audio.tags else None
+        title = str(title_frame.text[0]) if title_frame and title_frame.text else None
+        artist_frame = audio.tags.get("TPE1") if audio.tags else None
+        artist = str(artist_frame.text[0]) if artist_frame and artist_frame.text else None
+        return bitrate, title, artist or None
     except Exception:
-        return None
+        return 0, None, None
 
 def extract_remixer_from_title(title):
     """Extract remixer name from title like 'Song (Remixer Name Remix)'."""
-    # Pattern: anything in parentheses before keywords like Remix, Edit, Bootleg, etc.
+    # Pattern: anything in parentheses/brackets before keywords like Remix, Edit, Bootleg, etc.
     # Example: "Song (Ale Lucchi Remix)" -> "Ale Lucchi"
-    patterns = [
-        r'\(([^)]+?)\s+(?:Remix|Edit|Bootleg|Flip|VIP|Rework|Refix|Mix)\)',  # (Name Remix)
-        r'\[([^\]]+?)\s+(?:Remix|Edit|Bootleg|Flip|VIP|Rework|Refix|Mix)\]',  # [Name Remix]
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, title, re.IGNORECASE)
-        if match:
-            remixer = match.group(1).strip()
-            # Clean up common prefixes
-            remixer = re.sub(r'^(?:DJ\s+|dj\s+)', '', remixer)
-            return remixer if remixer else None
-    
+    match = _REMIX_TAG_RE.search(title)
+    if match:
+        remixer = match.group(1).strip()
+        # Clean up common prefixes
+        remixer = _DJ_PREFIX_RE.sub('', remixer)
+        return remixer if remixer else None
+
     return None
 
-def extract_genre_from_remix_title(title, energy_map):
+def build_genre_matcher(energy_map):
     """
-    Extract genre from remix title if genre name is included.
-    Example: "Song (Esquire Afro House Remix)" -> "Afro House"
-    Only extracts multi-word genres to avoid false matches with artist names.
-    Uses genres from energy_map.json for consistency.
+    Build a single compiled regex that matches any known multi-word genre.
+    Collects genres from energy_map.json and joins them into one alternation
+    sorted longest-first, so the most specific genre wins and one .search()
+    replaces a per-genre regex loop on every track.
+    Only includes multi-word genres (2+ words) to avoid false matches -
+    single words like "groove", "house", "funk" are too common in artist names.
     """
     # Collect all genres from energy map
     known_genres = []
     for level, genre_list in energy_map.items():
         known_genres.extend(genre_list)
-    
-    # Filter to only multi-word genres (2+ words) to avoid false matches
-    # Single words like "groove", "house", "funk" are too common in artist names
+
     multi_word_genres = [g for g in known_genres if ' ' in g or '&' in g or '-' in g]
-    
+    if not multi_word_genres:
+        return None
+
+    sorted_genres = sorted(multi_word_genres, key=len, reverse=True)
+    return re.compile(r'\b(' + '|'.join(re.escape(g) for g in sorted_genres) + r')\b', re.IGNORECASE)
+
+def extract_genre_from_remix_title(title, genre_matcher):
+    """
+    Extract genre from remix title if genre name is included.
+    Example: "Song (Esquire Afro House Remix)" -> "Afro House"
+    Uses the precompiled matcher from build_genre_matcher() for consistency
+    with energy_map.json.
+    """
+    if genre_matcher is None:
+        return None
+
     # Extract only the remix/edit portion (what's in parentheses/brackets before Remix/Edit/etc.)
     # Example: "Song (Groove Coverage Afro House Remix)" -> extract "groove coverage afro house"
-    remix_patterns = [
-        r'\(([^)]+?)\s+(?:Remix|Edit|Bootleg|Flip|VIP|Rework|Refix|Mix)\)',  # (Name Remix)
-        r'\[([^\]]+?)\s+(?:Remix|Edit|Bootleg|Flip|VIP|Rework|Refix|Mix)\]',  # [Name Remix]
-    ]
-    
-    for pattern in remix_patterns:
-        match = re.search(pattern, title, re.IGNORECASE)
-        if match:
-            remix_content = match.group(1).lower()
-            
-            # Look for multi-word genre names (prioritize longer/more specific names first)
-            # e.g., "afro house", "tech house", "drum & bass", "dance-pop"
-            for genre in sorted(multi_word_genres, key=len, reverse=True):
-                # Check if genre appears as a distinct phrase (word boundaries)
-                genre_pattern = r'\b' + re.escape(genre) + r'\b'
-                if re.search(genre_pattern, remix_content):
-                    # Convert to Title Case using normalize_genre_case
-                    return normalize_genre_case(genre)
-    
+    match = _REMIX_TAG_RE.search(title)
+    if match:
+        genre_match = genre_matcher.search(match.group(1))
+        if genre_match:
+            # Convert to Title Case using normalize_genre_case
+            return normalize_genre_case(genre_match.group(1).lower())
+
     return None
 
 def detect_transition(title):
@@ -190,9 +459,7 @@ def detect_transition(title):
     """
     # Pattern: two numbers separated by a dash (BPM transition)
     # Example: "128-94", "130-100", etc.
-    transition_pattern = r'\b(\d{2,3})-(\d{2,3})\b'
-    
-    match = re.search(transition_pattern, title)
+    match = _TRANSITION_RE.search(title)
     if match:
         # Verify these look like BPM values (typically 60-200)
         bpm1 = int(match.group(1))
@@ -208,20 +475,35 @@ def detect_club_mix(title):
     Example: "Song (Club Mix)", "Song (Club Version)", "Song - Club Mix" -> True
     Returns True if club mix pattern found, False otherwise.
     """
-    # Pattern: look for "club mix", "club version", "club edit", etc.
-    club_patterns = [
-        r'\bclub\s+mix\b',
-        r'\bclub\s+version\b',
-        r'\bclub\s+edit\b',
-        r'\bclub\s+remix\b',
-    ]
-    
-    title_lower = title.lower()
-    for pattern in club_patterns:
-        if re.search(pattern, title_lower):
-            return True
-    
-    return False
+    # One precompiled alternation covers "club mix/version/edit/remix"
+    return bool(_CLUB_MIX_RE.search(title))
+
+# Lower-cased genre -> canonical Title Case form for every genre in
+# energy_map.json, populated once by build_genre_canon()
+_genre_canon = {}
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_single_genre(g):
+    """Title-case one genre name, handling acronyms and special terms (memoized -
+    a library has a few dozen distinct genres across thousands of files)."""
+    if g.upper() in ['EDM', 'DNB', 'R&B', 'UK', 'VIP']:
+        return g.upper()
+    elif g.lower() == 'k-pop':
+        return 'K-Pop'
+    elif '&' in g:
+        # Handle "Drum & Bass" style
+        parts = g.split('&')
+        return ' & '.join(word.strip().capitalize() for word in parts)
+    else:
+        # Standard title case
+        return ' '.join(word.capitalize() for word in g.split())
+
+def build_genre_canon(energy_map):
+    """Precompute the canonical case for every known genre once at startup."""
+    _genre_canon.clear()
+    for genre_list in energy_map.values():
+        for g in genre_list:
+            _genre_canon[g.lower()] = _normalize_single_genre(g)
 
 def normalize_genre_case(genre):
     """
@@ -231,26 +513,23 @@ def normalize_genre_case(genre):
     """
     if not genre:
         return genre
-    
+
+    # Fast path: a single genre is one dict hit / memoized call with no
+    # split-and-join pass. Title Case alone isn't proof of canonical form -
+    # the acronym table still rewrites e.g. "Dnb" -> "DNB"
+    if '/' not in genre:
+        g = genre.strip()
+        return _genre_canon.get(g.lower()) or _normalize_single_genre(g)
+
     # Split by "/" for multi-genre
     genres = [g.strip() for g in genre.split('/')]
-    
-    # Title case each genre, handling special cases
-    normalized = []
-    for g in genres:
-        # Special handling for acronyms and special terms
-        if g.upper() in ['EDM', 'DNB', 'R&B', 'UK', 'VIP']:
-            normalized.append(g.upper())
-        elif g.lower() == 'k-pop':
-            normalized.append('K-Pop')
-        elif '&' in g:
-            # Handle "Drum & Bass" style
-            parts = g.split('&')
-            normalized.append(' & '.join(word.strip().capitalize() for word in parts))
-        else:
-            # Standard title case
-            normalized.append(' '.join(word.capitalize() for word in g.split()))
-    
+
+    # Known genres are a dict hit; anything else is title-cased on the fly
+    normalized = [
+        _genre_canon.get(g.lower()) or _normalize_single_genre(g)
+        for g in genres
+    ]
+
     return ' / '.join(normalized)
 
 async def query_soundcloud_genre(title, artist=None):
@@ -259,120 +538,339 @@ async def query_soundcloud_genre(title, artist=None):
         return None
     
     try:
-        # Create async HTTP session and SoundCloud client
-        async with aiohttp.ClientSession() as session:
-            sc = SoundcloudAsyncAPI(
-                client_id=SOUNDCLOUD_CLIENT_ID,
-                auth_token=SOUNDCLOUD_AUTH_TOKEN,
-                http_session=session
-            )
-            
-            # Build search query with artist if available
-            search_query = f"{artist} {title}" if artist else title
-            
-            # Search for the track on SoundCloud
-            results = await sc.search(query_string=search_query, limit=5)
-            
-            # Handle dict response
-            if isinstance(results, dict):
-                collection = results.get('collection', [])
+        # Reuse the shared client and keep-alive session - no per-call TLS handshake
+        sc = await _get_sc_client()
+        
+        # Build search query with artist if available
+        search_query = f"{artist} {title}" if artist else title
+        
+        # Search for the track on SoundCloud
+        results = await sc.search(query_string=search_query, limit=5)
+        
+        # Handle dict response
+        if isinstance(results, dict):
+            collection = results.get('collection', [])
+        else:
+            collection = getattr(results, 'collection', [])
+        
+        if not collection:
+            return None
+        
+        # Look for best match
+        search_title_lower = title.lower()
+        search_artist_lower = artist.lower() if artist else ""
+        
+        for idx, track in enumerate(collection):
+            # Handle both dict and object responses
+            if isinstance(track, dict):
+                kind = track.get('kind', '')
+                track_title_original = track.get('title', '')
+                track_title = track_title_original.lower()
+                track_artist = track.get('user', {}).get('username', '').lower() if isinstance(track.get('user'), dict) else ''
+                genre = track.get('genre', '')
             else:
-                collection = getattr(results, 'collection', [])
+                kind = getattr(track, 'kind', '')
+                track_title_original = getattr(track, 'title', '')
+                track_title = track_title_original.lower()
+                track_user = getattr(track, 'user', None)
+                track_artist = getattr(track_user, 'username', '').lower() if track_user else ''
+                genre = getattr(track, 'genre', '')
             
-            if not collection:
-                return None
-            
-            # Look for best match
-            search_title_lower = title.lower()
-            search_artist_lower = artist.lower() if artist else ""
-            
-            for idx, track in enumerate(collection):
-                # Handle both dict and object responses
-                if isinstance(track, dict):
-                    kind = track.get('kind', '')
-                    track_title_original = track.get('title', '')
-                    track_title = track_title_original.lower()
-                    track_artist = track.get('user', {}).get('username', '').lower() if isinstance(track.get('user'), dict) else ''
-                    genre = track.get('genre', '')
-                else:
-                    kind = getattr(track, 'kind', '')
-                    track_title_original = getattr(track, 'title', '')
-                    track_title = track_title_original.lower()
-                    track_user = getattr(track, 'user', None)
-                    track_artist = getattr(track_user, 'username', '').lower() if track_user else ''
-                    genre = getattr(track, 'genre', '')
+            if kind == 'track':
+                # Check if it's a good match (keyword-based matching)
+                # Extract key words from search title (remove parentheses content)
+                search_keywords = search_title_lower.replace('(', ' ').replace(')', ' ').split()
+                search_keywords = [w for w in search_keywords if len(w) > 3]  # Filter short words
                 
-                if kind == 'track':
-                    # Check if it's a good match (keyword-based matching)
-                    # Extract key words from search title (remove parentheses content)
-                    search_keywords = search_title_lower.replace('(', ' ').replace(')', ' ').split()
-                    search_keywords = [w for w in search_keywords if len(w) > 3]  # Filter short words
-                    
-                    # Count matching keywords in title
-                    title_match_count = sum(1 for kw in search_keywords if kw in track_title)
-                    
-                    # Bonus points for artist match (if provided)
-                    artist_match = False
-                    if artist and search_artist_lower:
-                        # Check if artist name appears in track artist or title
-                        artist_keywords = search_artist_lower.split()
-                        artist_match = any(kw in track_artist or kw in track_title for kw in artist_keywords if len(kw) > 2)
-                    
-                    # Require at least 2 matching keywords (reduced from 3 when artist is provided)
-                    min_matches = 2 if artist else 3
-                    
-                    # Match if: enough title keywords match OR (some title matches + artist matches)
-                    if title_match_count >= min_matches or (title_match_count >= 1 and artist_match):
-                        if genre and genre.lower() not in ['', 'unknown', 'other']:
-                            artist_info = f" by {track_artist}" if track_artist else ""
-                            print(f"  🔊 SoundCloud: '{track_title_original[:40]}...'{artist_info} → Genre: {genre}")
-                            # Return both genre and artist for validation (genre will be normalized later)
-                            return (genre, track_artist)
-            
-            return None
+                # Count matching keywords in title
+                title_match_count = sum(1 for kw in search_keywords if kw in track_title)
+                
+                # Bonus points for artist match (if provided)
+                artist_match = False
+                if artist and search_artist_lower:
+                    # Check if artist name appears in track artist or title
+                    artist_keywords = search_artist_lower.split()
+                    artist_match = any(kw in track_artist or kw in track_title for kw in artist_keywords if len(kw) > 2)
+                
+                # Require at least 2 matching keywords (reduced from 3 when artist is provided)
+                min_matches = 2 if artist else 3
+                
+                # Match if: enough title keywords match OR (some title matches + artist matches)
+                if title_match_count >= min_matches or (title_match_count >= 1 and artist_match):
+                    if genre and genre.lower() not in ['', 'unknown', 'other']:
+                        artist_info = f" by {track_artist}" if track_artist else ""
+                        logger.info("  🔊 SoundCloud: '%s...'%s → Genre: %s", track_title_original[:40], artist_info, genre)
+                        # Return both genre and artist for validation (genre will be normalized later)
+                        return (genre, track_artist)
+        
+        return None
+    except Exception as e:
+        logger.warning("  ⚠️ SoundCloud lookup failed: %s", e)
+        return None
+
+# One event loop and aiohttp session shared by every SoundCloud call for the
+# whole run - asyncio.run() per lookup paid loop startup plus a fresh TCP/TLS
+# handshake each time
+_sc_loop = None
+_sc_session = None
+_sc_client = None
+_sc_client_session = None  # session the cached client was built on
+
+def _get_sc_loop():
+    global _sc_loop
+    if _sc_loop is None:
+        _sc_loop = asyncio.new_event_loop()
+    return _sc_loop
+
+async def _get_sc_session():
+    global _sc_session
+    if _sc_session is None or _sc_session.closed:
+        # Keep-alive pool with bounded connections and cached DNS; an overall
+        # timeout stops one slow lookup from stalling the whole batch
+        _sc_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=15),
+        )
+    return _sc_session
+
+async def _get_sc_client():
+    """Lazily build one SoundcloudAsyncAPI client on the shared session."""
+    global _sc_client, _sc_client_session
+    session = await _get_sc_session()
+    if _sc_client is None or _sc_client_session is not session:
+        _sc_client = SoundcloudAsyncAPI(
+            client_id=SOUNDCLOUD_CLIENT_ID,
+            auth_token=SOUNDCLOUD_AUTH_TOKEN,
+            http_session=session,
+        )
+        _sc_client_session = session
+    return _sc_client
+
+def close_soundcloud_session():
+    """Tear down the shared SoundCloud session and loop at shutdown."""
+    global _sc_loop, _sc_session, _sc_client, _sc_client_session
+    if _sc_loop is not None:
+        if _sc_session is not None and not _sc_session.closed:
+            _sc_loop.run_until_complete(_sc_session.close())
+        _sc_loop.close()
+    _sc_client = None
+    _sc_client_session = None
+    _sc_session = None
+    _sc_loop = None
+
+# Concurrent SoundCloud lookups per batch - bounded so we don't hammer the API
+SC_CONCURRENCY = 5
+
+# Run-scoped memo of SoundCloud results - the same remixer (and even the same
+# title under different paths) recurs constantly in a DJ library
+_sc_memo = {}
+
+def _sc_memo_key(title, remixer):
+    return (title.strip().lower(), remixer.strip().lower())
+
+def gather_soundcloud_results(lookups):
+    """
+    Resolve several (title, remixer) SoundCloud lookups concurrently on one
+    event loop instead of a blocking asyncio.run() per remix. A semaphore
+    bounds in-flight requests and repeats are served from the in-memory memo.
+    Returns {(title, remixer): result} where result is (genre, artist) or
+    None, mirroring query_soundcloud_genre.
+    """
+    if not lookups:
+        return {}
+
+    pending = [(t, r) for t, r in dict.fromkeys(lookups)
+               if _sc_memo_key(t, r) not in _sc_memo]
+
+    async def runner():
+        sem = asyncio.Semaphore(SC_CONCURRENCY)
+
+        async def one(title, remixer):
+            async with sem:
+                try:
+                    return await query_soundcloud_genre(title, remixer)
+                except Exception as e:
+                    logger.warning("  ⚠️ SoundCloud error: %s", e)
+                    return None
+
+        return await asyncio.gather(*(one(t, r) for t, r in pending))
+
+    if pending:
+        for (title, remixer), result in zip(pending, _get_sc_loop().run_until_complete(runner())):
+            _sc_memo[_sc_memo_key(title, remixer)] = result
+
+    return {key: _sc_memo[_sc_memo_key(*key)] for key in lookups}
+
+def lookup_soundcloud_genre(title, remixer):
+    """Memoized blocking wrapper for a single SoundCloud lookup."""
+    key = _sc_memo_key(title, remixer)
+    if key not in _sc_memo:
+        _sc_memo[key] = _get_sc_loop().run_until_complete(
+            query_soundcloud_genre(title, remixer))
+    return _sc_memo[key]
+
+# Monotonic deadline for the next allowed Gemini request. Retry backoff and
+# request pacing share this, so consecutive fast errors don't stack sleeps.
+_next_request_time = 0.0
+
+def wait_for_request_slot():
+    """Sleep until the next Gemini request is allowed (no-op if already due)."""
+    remaining = _next_request_time - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
+
+def defer_next_request(delay):
+    """Push the Gemini request deadline at least `delay` seconds into the future."""
+    global _next_request_time
+    _next_request_time = max(_next_request_time, time.monotonic() + delay)
+
+# Adaptive pacing: the inter-request delay shrinks while responses keep
+# succeeding (paid tiers never pay free-tier spacing) and doubles on a 429,
+# so the loop settles near whatever rate the quota actually allows
+API_DELAY_MIN_SECONDS = 1.0
+_current_delay = float(API_DELAY_SECONDS)
+
+def note_request_success():
+    """Shrink the pacing delay after a successful request and schedule the next slot."""
+    global _current_delay
+    _current_delay = max(API_DELAY_MIN_SECONDS, _current_delay * 0.9)
+    defer_next_request(_current_delay)
+
+def note_request_throttled():
+    """Grow the pacing delay after a quota error."""
+    global _current_delay
+    _current_delay = min(BACKOFF_CAP_SECONDS, _current_delay * 2)
+
+def compute_backoff(attempt, server_hint=None):
+    """
+    Exponential backoff with jitter for 429 retries. The server-provided
+    retryDelay (when parseable) acts as a floor, the exponential term grows
+    per attempt up to a cap, and 0-20%% jitter desynchronizes retries so
+    repeated failures don't hammer the quota window on the same beat.
+    """
+    delay = min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+    delay = max(delay, server_hint or 0)
+    return delay * (1 + random.uniform(0, 0.2))
+
+def create_chat():
+    """
+    Create the Gemini chat session with PROMPT_INSTRUCTIONS attached as a
+    system instruction, so no priming round-trip (one full API RTT plus its
+    retry loop) runs before the first real query. Structured output pins the
+    reply to GEMINI_RESPONSE_SCHEMA, so replies are valid JSON by contract.
+    Returns the chat, or None if initialization failed.
+    """
+    try:
+        return client.chats.create(
+            model="gemini-2.5-flash-lite",
+            config=types.GenerateContentConfig(
+                system_instruction=PROMPT_INSTRUCTIONS,
+                response_mime_type="application/json",
+                response_schema=GEMINI_RESPONSE_SCHEMA,
+            ),
+        )
     except Exception as e:
-        print(f"  ⚠️ SoundCloud lookup failed: {e}")
+        logger.error("❌ Failed to initialize chat: %s", e)
         return None
 
-def query_google_ai(title, chat, artist=None):
-    """Ask Gemini for structured metadata for a given title with retry logic."""
+def query_google_ai(songs, chat):
+    """
+    Ask Gemini for structured metadata for a batch of songs with retry logic.
+    `songs` is a list of (title, artist_or_None) tuples; the structured-output
+    reply is a JSON array with one object per entry (see split_batch_response).
+    """
+    label = songs[0][0] if len(songs) == 1 else f"batch of {len(songs)} songs"
+
+    # Number each song; include artist when available for more accurate genre identification
+    lines = []
+    for number, (title, artist) in enumerate(songs, 1):
+        lines.append(f"Song {number}:")
+        lines.append(f"Song title: {title}")
+        if artist:
+            lines.append(f"Artist: {artist}")
+    query = "\n".join(lines)
+
     for attempt in range(MAX_RETRIES):
         try:
-            # Include artist in query if available for more accurate genre identification
-            if artist:
-                query = f"Song title: {title}\nArtist: {artist}"
-            else:
-                query = f"Song title: {title}"
+            wait_for_request_slot()
             response = chat.send_message(query)
+            # Start the pacing window now so cache hits, SoundCloud lookups
+            # and tag writes for this batch overlap the wait instead of a
+            # fixed sleep stacking on top of them
+            note_request_success()
             return response.text.strip()
         except Exception as e:
             error_str = str(e)
             
             # Check if it's a quota exhaustion error (429 RESOURCE_EXHAUSTED)
             if "429" in error_str and "RESOURCE_EXHAUSTED" in error_str:
-                # Try to parse the retry delay from the error message
-                retry_delay = 60  # Default to 60 seconds
-                
-                # Look for retryDelay in the error (format: 'retryDelay': '28s' or 'retryDelay': '28.549952853s')
-                retry_match = re.search(r"'retryDelay':\s*'([\d.]+)s'", error_str)
-                if retry_match:
-                    # Parse as float and round up to nearest second
-                    retry_delay = int(float(retry_match.group(1))) + 1
-                
+                # Honor the server-suggested delay as a floor under exponential backoff
+                # (format: 'retryDelay': '28s' or 'retryDelay': '28.549952853s')
+                retry_match = _RETRY_DELAY_RE.search(error_str)
+                server_hint = float(retry_match.group(1)) + 1 if retry_match else None
+                retry_delay = compute_backoff(attempt, server_hint)
+                note_request_throttled()
+
                 if attempt < MAX_RETRIES - 1:  # Don't retry on last attempt
-                    print(f"⏳ Quota exhausted for '{title}'. Waiting {retry_delay} seconds before retry (attempt {attempt + 1}/{MAX_RETRIES})...")
-                    time.sleep(retry_delay)
+                    logger.warning("⏳ Quota exhausted for '%s'. Waiting %.0f seconds before retry (attempt %d/%d)...", label, retry_delay, attempt + 1, MAX_RETRIES)
+                    defer_next_request(retry_delay)
                     continue  # Retry the request
                 else:
-                    print(f"❌ Google AI query failed for '{title}' after {MAX_RETRIES} attempts: {e}")
+                    logger.error("❌ Google AI query failed for '%s' after %d attempts: %s", label, MAX_RETRIES, e)
                     return None
             else:
                 # For other errors, print and return None immediately
-                print(f"❌ Google AI query failed for '{title}': {e}")
+                logger.error("❌ Google AI query failed for '%s': %s", label, e)
                 return None
     
         return None
 
+def gemini_cache_key(title, artist):
+    """Stable cache key for one song's Gemini response block."""
+    return hashlib.sha1(
+        f"{PROMPT_VERSION}|{title}|{artist or ''}".encode("utf-8")
+    ).hexdigest()
+
+def split_batch_response(response, count):
+    """
+    Split a batched Gemini reply into per-song blocks. Structured-output
+    replies are a JSON array placed by song_number; each object is re-serialized
+    so blocks stay plain strings for the cache. Legacy "Song N:" header
+    splitting remains as a fallback for non-JSON replies. Returns a list of
+    `count` blocks; entries the model skipped or mis-numbered are None so
+    callers can flag them individually.
+    """
+    blocks = [None] * count
+
+    try:
+        items = json.loads(response)
+    except ValueError:
+        items = None
+    if isinstance(items, dict):
+        items = [items]  # single-song replies occasionally come back unwrapped
+    if isinstance(items, list):
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            index = int(item.get("song_number", position + 1)) - 1
+            if 0 <= index < count:
+                blocks[index] = json.dumps(item)
+        return blocks
+
+    matches = list(_SONG_BLOCK_RE.finditer(response))
+
+    # Single-song replies sometimes omit the header - use the whole response
+    if not matches and count == 1:
+        return [response]
+
+    for i, match in enumerate(matches):
+        index = int(match.group(1)) - 1
+        if 0 <= index < count:
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+            blocks[index] = response[match.end():end]
+
+    return blocks
+
 def validate_genre(genre_string, title, artist=None):
     """
     Validate genre and filter out vague/generic terms and artist/remixer names.
@@ -380,21 +878,22 @@ def validate_genre(genre_string, title, artist=None):
     """
     if not genre_string:
         return None
-    
-    # List of forbidden vague genres
-    vague_genres = ["edm", "dance", "electronic", "club music", "music"]
-    
-    # List of forbidden compound vague terms (e.g., "Dance & EDM")
-    forbidden_patterns = [
-        r'\b(dance|edm|electronic)\b.*\b(dance|edm|electronic)\b',  # "Dance & EDM", "Electronic Dance", etc.
-        r'\bedit\b$',  # "Edit" as a standalone genre
-        r'\bmix\b$',   # "Mix" as a standalone genre  
-        r'\bremix\b$', # "Remix" as a standalone genre
-    ]
-    
+
     # Extract remixer name from title to avoid using it as a genre
     remixer = extract_remixer_from_title(title)
-    
+
+    validated = _validate_genre_core(genre_string, remixer, artist)
+    if validated is None:
+        logger.warning("  ❌ All genres were too vague for '%s'. Marking as unknown.", title)
+    return validated
+
+@functools.lru_cache(maxsize=2048)
+def _validate_genre_core(genre_string, remixer, artist):
+    """
+    The pure, memoized part of genre validation: genre strings repeat
+    constantly across a library, so repeats skip the regex sweeps. Per-component
+    warnings therefore log once per distinct (genre, remixer, artist) combination.
+    """
     # Split by "/" for multi-genre tracks
     genres = [g.strip() for g in genre_string.split("/")]
     filtered_genres = []
@@ -403,28 +902,27 @@ def validate_genre(genre_string, title, artist=None):
         genre_lower = genre.lower().strip()
         
         # Check if it's a vague genre
-        if genre_lower in vague_genres:
-            print(f"  ⚠️ Vague genre detected: '{genre}' - skipping this genre component")
+        if genre_lower in _VAGUE_GENRES:
+            logger.warning("  ⚠️ Vague genre detected: '%s' - skipping this genre component", genre)
             continue
         
-        # Check for forbidden compound patterns
-        is_forbidden_pattern = False
-        for pattern in forbidden_patterns:
-            if re.search(pattern, genre_lower):
-                print(f"  ⚠️ Invalid genre pattern detected: '{genre}' - skipping")
-                is_forbidden_pattern = True
-                break
-        if is_forbidden_pattern:
+        # Check for forbidden patterns; cheap token/suffix guards skip the
+        # regex scans for the common case of a clean genre
+        if ((len(_VAGUE_TOKEN_RE.findall(genre_lower)) >= 2
+                and _FORBIDDEN_COMPOUND_RE.search(genre_lower))
+                or (genre_lower.endswith(("edit", "mix", "remix"))
+                    and _FORBIDDEN_SUFFIX_RE.search(genre_lower))):
+            logger.warning("  ⚠️ Invalid genre pattern detected: '%s' - skipping", genre)
             continue
         
         # Check if the "genre" is actually the remixer's name
         if remixer and remixer.lower() in genre_lower:
-            print(f"  ⚠️ Remixer name detected as genre: '{genre}' - skipping (remixer: {remixer})")
+            logger.warning("  ⚠️ Remixer name detected as genre: '%s' - skipping (remixer: %s)", genre, remixer)
             continue
         
         # Check if the "genre" is actually the artist's name
         if artist and len(artist) > 3 and artist.lower() in genre_lower:
-            print(f"  ⚠️ Artist name detected as genre: '{genre}' - skipping (artist: {artist})")
+            logger.warning("  ⚠️ Artist name detected as genre: '%s' - skipping (artist: %s)", genre, artist)
             continue
         
         # Allow "Club" if it's part of a compound genre like "Club House"
@@ -436,9 +934,8 @@ def validate_genre(genre_string, title, artist=None):
         filtered_genres.append(genre)
     
     if not filtered_genres:
-        print(f"  ❌ All genres were too vague for '{title}'. Marking as unknown.")
         return None
-    
+
     return " / ".join(filtered_genres)
 
 def sort_genre(genre_string):
@@ -451,62 +948,110 @@ def sort_genre(genre_string):
     sorted_genres = sorted(genres, key=lambda x: x.lower())
     return " / ".join(sorted_genres)
 
+# Response-line dispatch: one dict lookup per line instead of six startswith
+# checks. Values are (dict key, converter for the text after the colon).
+_RESPONSE_KEYS = {
+    "Is Remix": ("is_remix", lambda v: v.strip().lower() == "yes"),
+    "Genre": ("genre", lambda v: sort_genre(v.strip())),  # sorted multi-genre
+    "Original Artists": ("artists", str.strip),
+    "Original Song Release": ("year", str.strip),
+    "Situation": ("situation", str.strip),
+    "Commercial Friendly": ("commercial", str.strip),
+}
+
 def parse_response(response):
-    """Extract is_remix, genre, artists, year, situation, and commercial friendly from the Gemini reply."""
+    """
+    Extract is_remix, genre, artists, year, situation, and commercial friendly
+    from a per-song reply block. Structured-output blocks are JSON objects and
+    decode directly; the line-by-line path still handles locally built blocks
+    and cached responses from before structured output.
+    """
+    if response.lstrip().startswith("{"):
+        try:
+            item = json.loads(response)
+        except ValueError:
+            item = None
+        if isinstance(item, dict):
+            return {
+                "is_remix": bool(item.get("is_remix")),
+                "genre": sort_genre(str(item.get("genre", "")).strip()),
+                "artists": str(item.get("original_artists", "")).strip(),
+                "year": str(item.get("original_song_release", "")).strip(),
+                "situation": str(item.get("situation", "")).strip(),
+                "commercial": str(item.get("commercial_friendly", "")).strip(),
+            }
+
     data = {}
     for line in response.splitlines():
-        if line.startswith("Is Remix:"):
-            is_remix = line.split(":", 1)[1].strip().lower()
-            data["is_remix"] = is_remix == "yes"
-        elif line.startswith("Genre:"):
-            genre = line.split(":", 1)[1].strip()
-            # Sort multi-genre alphabetically
-            data["genre"] = sort_genre(genre)
-        elif line.startswith("Original Artists:"):
-            data["artists"] = line.split(":", 1)[1].strip()
-        elif line.startswith("Original Song Release:"):
-            data["year"] = line.split(":", 1)[1].strip()
-        elif line.startswith("Situation:"):
-            data["situation"] = line.split(":", 1)[1].strip()
-        elif line.startswith("Commercial Friendly:"):
-            data["commercial"] = line.split(":", 1)[1].strip()
+        field, _, value = line.partition(":")
+        entry = _RESPONSE_KEYS.get(field)
+        if entry:
+            key, convert = entry
+            data[key] = convert(value)
     return data
 
-def determine_energy_rating(genre, energy_map):
+def build_energy_index(energy_map):
+    """
+    Build lookup structures for determine_energy_rating once at startup.
+    Returns (exact, substrings): a {genre: level} dict for exact matches and
+    a list of (genre, level) tuples for substring fallback, so per-track
+    lookups don't re-scan and re-sort the energy map. Level order from the
+    energy map is preserved - the substring pass returns the first level with
+    any match, sorting by length only within a level, exactly like scanning
+    the map directly.
+    """
+    exact = {}
+    substrings = []
+    for level, genre_list in energy_map.items():
+        for g in genre_list:
+            # Keep the first level listed for a genre (matches old iteration order)
+            if g not in exact:
+                exact[g] = int(level)
+        # Longest first within the level so the most specific genre matches
+        # first (e.g., "baile funk" before "funk")
+        for g in sorted(genre_list, key=len, reverse=True):
+            substrings.append((g, int(level)))
+
+    return exact, substrings
+
+# Genre string -> rating memo; genres repeat heavily across a library and the
+# energy index never changes within a run
+_energy_rating_memo = {}
+
+def determine_energy_rating(genre, energy_index):
     """Return energy rating (1–5) based on genre. For multi-genre tracks, returns the highest energy level."""
+    if genre in _energy_rating_memo:
+        return _energy_rating_memo[genre]
+
+    exact, substrings = energy_index
+
     # Split by "/" to handle multi-genre tracks
     genres = [g.strip().lower() for g in genre.split('/')]
-    
+
     found_ratings = []
     for single_genre in genres:
-        matched = False
-        
         # Pass 1: Try exact match first (e.g., "baile funk" matches "baile funk")
-        for level, genre_list in energy_map.items():
-            if single_genre in genre_list:
-                found_ratings.append(int(level))
-                matched = True
-                break
-        
+        rating = exact.get(single_genre)
+
         # Pass 2: If no exact match, try substring match (e.g., "deep house" contains "house")
-        # Sort genre_list by length (longest first) to match most specific first
-        if not matched:
-            for level, genre_list in energy_map.items():
-                sorted_genres = sorted(genre_list, key=len, reverse=True)
-                if any(g in single_genre for g in sorted_genres):
-                    found_ratings.append(int(level))
-                    break
-    
+        if rating is None:
+            rating = next((level for g, level in substrings if g in single_genre), None)
+
+        if rating is not None:
+            found_ratings.append(rating)
+
     # Return the highest energy level found, or None if no matches
-    return max(found_ratings) if found_ratings else None
+    rating = max(found_ratings) if found_ratings else None
+    _energy_rating_memo[genre] = rating
+    return rating
 
-def apply_metadata(file_path, info, energy_map, unknown_genres):
-    """Apply ID3 metadata and energy-based rating."""
+def apply_metadata(file_path, info, energy_index, unknown_genres):
+    """Apply ID3 metadata and energy-based rating in a single open/save cycle."""
     try:
-        audio = EasyID3(file_path)
+        id3 = ID3(file_path)
     except Exception:
-        audio = MP3(file_path, ID3=EasyID3)
-        audio.add_tags()
+        # No existing tag block - start a fresh one, save() below creates it
+        id3 = ID3()
 
     genre = info.get("genre", "")
     artists = info.get("artists", "")
@@ -515,88 +1060,180 @@ def apply_metadata(file_path, info, energy_map, unknown_genres):
     if genre:
         # For ID3 tags, convert "/" to ";" for multi-genre support
         id3_genre = genre.replace(" / ", "; ").replace("/", "; ")
-        audio["genre"] = id3_genre
+        id3.add(TCON(encoding=3, text=id3_genre))
     if artists:
-        audio["artist"] = artists
+        id3.add(TPE1(encoding=3, text=artists))
     if year:
-        audio["date"] = year
-
-    audio.save()
+        id3.add(TDRC(encoding=3, text=year))
 
-    # Handle rating separately using ID3 POPM frame
+    # Handle rating via the POPM frame in the same tag block
     rating = None
-    if genre:
-        # Skip rating for mashups as they have varying energy levels
-        if "mashup" in genre.lower():
-            return None
-        
-        rating = determine_energy_rating(genre, energy_map)
+    is_mashup = genre and "mashup" in genre.lower()
+    if genre and not is_mashup:
+        rating = determine_energy_rating(genre, energy_index)
         if rating is not None:
-            # Use ID3 directly for rating (POPM frame)
-            try:
-                id3 = ID3(file_path)
-                # Map 1-5 rating to 0-255 scale for POPM
-                # 1=1-63, 2=64-127, 3=128-191, 4=192-223, 5=224-255
-                rating_map = {1: 1, 2: 64, 3: 128, 4: 192, 5: 255}
-                popm_rating = rating_map.get(rating, rating * 51)
-                id3.add(POPM(email="rating@rekordbox", rating=popm_rating, count=0))
-                id3.save()
-            except Exception as e:
-                print(f"⚠️ Failed to set rating for {file_path}: {e}")
+            # Map 1-5 rating to 0-255 scale for POPM
+            # 1=1-63, 2=64-127, 3=128-191, 4=192-223, 5=224-255
+            rating_map = {1: 1, 2: 64, 3: 128, 4: 192, 5: 255}
+            popm_rating = rating_map.get(rating, rating * 51)
+            id3.add(POPM(email="rating@rekordbox", rating=popm_rating, count=0))
         else:
             unknown_genres.append((os.path.basename(file_path), genre))
 
+    try:
+        id3.save(file_path)
+    except Exception as e:
+        logger.warning("⚠️ Failed to save tags for %s: %s", file_path, e)
+
+    # Skip rating for mashups as they have varying energy levels
+    if is_mashup:
+        return None
     return rating
 
+# Per-run caches of Rekordbox tag/genre rows by name, populated by
+# preload_tag_caches(). Tag names repeat constantly ("Bar", "Club",
+# "Commercial" plus a small genre universe), so cache hits replace DB queries.
+_mytag_by_name = {}
+_genre_by_name = {}
+
+def preload_tag_caches(db):
+    """Load the full MyTag and Genre tables into the name caches once."""
+    _mytag_by_name.clear()
+    _genre_by_name.clear()
+    for tag in db.get_my_tag():
+        _mytag_by_name[tag.Name] = tag
+    for genre in db.get_genre():
+        _genre_by_name[genre.Name] = genre
+
 def update_rekordbox_genre(track, genre_name, db):
     """Update the genre in Rekordbox database."""
     try:
-        # Search for existing genre
-        existing_genres = list(db.get_genre(Name=genre_name))
-        
-        if existing_genres:
-            # Genre exists, use it
-            genre = existing_genres[0]
-        else:
-            # Create new genre
-            genre_id = db.generate_unused_id(tables.DjmdGenre)
-            genre = tables.DjmdGenre.create(ID=genre_id, Name=genre_name)
-            db.add(genre)
-        
+        genre = _genre_by_name.get(genre_name)
+
+        if genre is None:
+            # Search for existing genre
+            existing_genres = list(db.get_genre(Name=genre_name))
+
+            if existing_genres:
+                # Genre exists, use it
+                genre = existing_genres[0]
+            else:
+                # Create new genre
+                genre_id = allocate_id(db, tables.DjmdGenre)
+                genre = tables.DjmdGenre.create(ID=genre_id, Name=genre_name)
+                db.add(genre)
+
+            _genre_by_name[genre_name] = genre
+
         # Update track's genre
         track.GenreID = genre.ID
         
     except Exception as e:
-        print(f"  ⚠️ Failed to update Rekordbox genre: {e}")
+        logger.warning("  ⚠️ Failed to update Rekordbox genre: %s", e)
+
+class IdAllocator:
+    """
+    Hand out unused row IDs for one table from memory. Seeded once with
+    max(ID)+1, after which every take() is a plain increment instead of the
+    SELECT-based probe db.generate_unused_id() runs per insert. Allocations
+    honor the same bounds generate_unused_id enforces (above 100, below
+    2^28); if the sequential window above max(ID) runs out, take() falls
+    back to generate_unused_id to reuse gaps. Safe because this process is
+    the only writer - the script refuses to run while Rekordbox is open.
+    """
+    ID_CEILING = 1 << 28  # Rekordbox IDs are random 28-bit values
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.next_id = None
+
+    def take(self):
+        if self.next_id is None:
+            # IDs are numeric strings in the Rekordbox schema - compare as ints
+            current_max = self.db.query(func.max(cast(self.table.ID, Integer))).scalar()
+            self.next_id = max(current_max or 0, 100) + 1
+        if self.next_id >= self.ID_CEILING:
+            # Sequential window exhausted - probe the gaps below max(ID)
+            return self.db.generate_unused_id(self.table, is_28_bit=True)
+        value = self.next_id
+        self.next_id += 1
+        return value
+
+# One allocator per table, created on first use
+_id_allocators = {}
+
+def allocate_id(db, table):
+    """Take the next free ID for `table` from its in-memory allocator."""
+    alloc = _id_allocators.get(table)
+    if alloc is None:
+        alloc = _id_allocators[table] = IdAllocator(db, table)
+    return alloc.take()
+
+def tune_rekordbox_sqlite(db):
+    """
+    Apply SQLite PRAGMAs suited to this batch-write workload: WAL turns every
+    commit into an appended log frame instead of a full journal rewrite,
+    synchronous=NORMAL is safe under WAL, and the larger cache/mmap keep hot
+    index pages out of the page cache round-trip. Best-effort - if Rekordbox
+    holds the file or pyrekordbox changes internals, tagging still works at
+    the default settings.
+    """
+    pragmas = (
+        "journal_mode=WAL",
+        "synchronous=NORMAL",
+        "cache_size=-65536",
+        "temp_store=MEMORY",
+        "mmap_size=268435456",
+        "wal_autocheckpoint=1000",
+    )
+    try:
+        for pragma in pragmas:
+            db.session.execute(text(f"PRAGMA {pragma}"))
+    except Exception as e:
+        logger.warning("  ⚠️ SQLite tuning skipped: %s", e)
+
+def build_track_index(db):
+    """
+    Map FolderPath -> track ID in one two-column SELECT instead of hydrating
+    every DjmdContent row up front - most columns and relationships of the
+    full index are never touched. tag_rekordbox fetches the full ORM row
+    lazily, and only for songs that actually match.
+    """
+    rows = (db.query(tables.DjmdContent.ID, tables.DjmdContent.FolderPath)
+            .yield_per(1000))
+    return {path: track_id for track_id, path in rows if path}
 
-def tag_rekordbox(file_path, title, situation, genre, rating, commercial, is_transition, db):
+def tag_rekordbox(file_path, title, situation, genre, rating, commercial, is_transition, db, track_by_path):
     """Assign MyTags ('Bar', 'Club', 'Commercial') to Rekordbox tracks, update genre and rating.
     Note: is_transition parameter is kept for future use but not currently used for tagging."""
     try:
-        # Convert to absolute path to match Rekordbox database format
-        abs_path = os.path.abspath(file_path).replace('\\', '/')
-        
-        # Search for the track by title (from ID3 tags)
-        tracks = db.search_content(title)
-        
-        # Find exact match by path
+        # Normalize separators to match Rekordbox database format (paths from
+        # the scan are already absolute, so this is a pure string operation)
+        abs_path = file_path.replace(os.sep, '/')
+
+        # Look up the track ID in the preloaded index, then hydrate the full
+        # row only for this one match
+        track_id = track_by_path.get(abs_path)
         track = None
-        for t in tracks:
-            if t.FolderPath and abs_path == t.FolderPath:
-                track = t
-                break
-        
+        if track_id is not None:
+            track = db.query(tables.DjmdContent).filter_by(ID=track_id).one_or_none()
+
         if not track:
-            print(f"  ⚠️ Track not found in Rekordbox database: {title}")
+            logger.warning("  ⚠️ Track not found in Rekordbox database: %s", title)
             return
 
         # Clear all existing MyTag links for this track (reset tags)
         existing_song_tags = db.query(tables.DjmdSongMyTag).filter_by(ContentID=track.ID).all()
         if existing_song_tags:
-            print(f"  🔄 Clearing {len(existing_song_tags)} existing tag(s) for: {title}")
+            logger.info("  🔄 Clearing %d existing tag(s) for: %s", len(existing_song_tags), title)
             for song_tag in existing_song_tags:
                 db.delete(song_tag)
 
+        # Snapshot the linked tag IDs once - each `in track.MyTagIDs` check
+        # re-walks the ORM relationship list on every access
+        existing_tag_ids = set(track.MyTagIDs)
+
         # Update genre in Rekordbox database
         if genre:
             update_rekordbox_genre(track, genre, db)
@@ -607,22 +1244,34 @@ def tag_rekordbox(file_path, title, situation, genre, rating, commercial, is_tra
 
         def ensure_tag(name, parent_name="Situation"):
             """Get or create a MyTag by name under a parent category."""
-            # First check if tag already exists
+            # First check the preloaded cache
+            tag = _mytag_by_name.get(name)
+            if tag is not None:
+                return tag
+
+            # Fall back to a direct lookup in case the cache wasn't preloaded
             existing_tags = list(db.get_my_tag(Name=name))
             if existing_tags:
-                return existing_tags[0]
-            
-            # Find the parent tag (e.g., "Situation")
-            parent_tags = list(db.get_my_tag(Name=parent_name))
-            parent_id = parent_tags[0].ID if parent_tags else None
-            
-            # Generate a unique ID for the new tag
-            new_id = db.generate_unused_id(tables.DjmdMyTag)
-            
-            # Create new tag under parent with generated ID
-            new_tag = tables.DjmdMyTag.create(ID=new_id, Name=name, ParentID=parent_id)
-            db.add(new_tag)
-            return new_tag
+                tag = existing_tags[0]
+            else:
+                # Find the parent tag (e.g., "Situation")
+                parent_tag = _mytag_by_name.get(parent_name)
+                if parent_tag is None:
+                    parent_tags = list(db.get_my_tag(Name=parent_name))
+                    parent_tag = parent_tags[0] if parent_tags else None
+                    if parent_tag is not None:
+                        _mytag_by_name[parent_name] = parent_tag
+                parent_id = parent_tag.ID if parent_tag else None
+
+                # Generate a unique ID for the new tag
+                new_id = allocate_id(db, tables.DjmdMyTag)
+
+                # Create new tag under parent with generated ID
+                tag = tables.DjmdMyTag.create(ID=new_id, Name=name, ParentID=parent_id)
+                db.add(tag)
+
+            _mytag_by_name[name] = tag
+            return tag
 
         tags_added = []
         situation_lower = situation.lower()
@@ -637,43 +1286,46 @@ def tag_rekordbox(file_path, title, situation, genre, rating, commercial, is_tra
         if should_add_bar:
             bar_tag = ensure_tag("Bar")
             # Check if tag already linked
-            if bar_tag.ID not in track.MyTagIDs:
+            if bar_tag.ID not in existing_tag_ids:
                 # Create junction table entry
-                junction_id = db.generate_unused_id(tables.DjmdSongMyTag)
+                junction_id = allocate_id(db, tables.DjmdSongMyTag)
                 song_tag = tables.DjmdSongMyTag.create(
                     ID=junction_id,
                     ContentID=track.ID,
                     MyTagID=bar_tag.ID
                 )
                 db.add(song_tag)
+                existing_tag_ids.add(bar_tag.ID)
                 tags_added.append("Bar")
 
         if should_add_club:
             club_tag = ensure_tag("Club")
             # Check if tag already linked
-            if club_tag.ID not in track.MyTagIDs:
+            if club_tag.ID not in existing_tag_ids:
                 # Create junction table entry
-                junction_id = db.generate_unused_id(tables.DjmdSongMyTag)
+                junction_id = allocate_id(db, tables.DjmdSongMyTag)
                 song_tag = tables.DjmdSongMyTag.create(
                     ID=junction_id,
                     ContentID=track.ID,
                     MyTagID=club_tag.ID
                 )
                 db.add(song_tag)
+                existing_tag_ids.add(club_tag.ID)
                 tags_added.append("Club")
 
         if should_add_commercial:
             commercial_tag = ensure_tag("Commercial")
             # Check if tag already linked
-            if commercial_tag.ID not in track.MyTagIDs:
+            if commercial_tag.ID not in existing_tag_ids:
                 # Create junction table entry
-                junction_id = db.generate_unused_id(tables.DjmdSongMyTag)
+                junction_id = allocate_id(db, tables.DjmdSongMyTag)
                 song_tag = tables.DjmdSongMyTag.create(
                     ID=junction_id,
                     ContentID=track.ID,
                     MyTagID=commercial_tag.ID
                 )
                 db.add(song_tag)
+                existing_tag_ids.add(commercial_tag.ID)
                 tags_added.append("Commercial")
         
         # Add genre tags under "Genre" parent
@@ -684,24 +1336,227 @@ def tag_rekordbox(file_path, title, situation, genre, rating, commercial, is_tra
             for genre_name in genre_list:
                 genre_tag = ensure_tag(genre_name, parent_name="Genre")
                 # Check if tag already linked
-                if genre_tag.ID not in track.MyTagIDs:
+                if genre_tag.ID not in existing_tag_ids:
                     # Create junction table entry
-                    junction_id = db.generate_unused_id(tables.DjmdSongMyTag)
+                    junction_id = allocate_id(db, tables.DjmdSongMyTag)
                     song_tag = tables.DjmdSongMyTag.create(
                         ID=junction_id,
                         ContentID=track.ID,
                         MyTagID=genre_tag.ID
                     )
                     db.add(song_tag)
+                    existing_tag_ids.add(genre_tag.ID)
                     tags_added.append(f"Genre:{genre_name}")
             
     except Exception as e:
-        import traceback
-        print(f"  ⚠️ Rekordbox tagging failed: {e}")
-        print(f"  Full error traceback:")
+        logger.error("  ⚠️ Rekordbox tagging failed: %s", e)
+        logger.error("  Full error traceback:")
         traceback.print_exc()
         raise  # Re-raise to stop execution
 
+def parse_title_features(title, genre_matcher):
+    """
+    Parse everything the pipeline wants from a title in one place: remix
+    hint, remixer name, genre named in the title, and club-mix/transition
+    flags. Both the batch pre-pass and process_song read this dict instead
+    of re-running the same regexes over the same string.
+    """
+    return {
+        "remix_hint": bool(_IS_REMIX_RE.search(title)),
+        "remixer": extract_remixer_from_title(title),
+        "title_genre": extract_genre_from_remix_title(title, genre_matcher),
+        "is_club_mix": detect_club_mix(title),
+        "is_transition": detect_transition(title),
+    }
+
+def build_local_block(title, artist, features, sc_results, energy_index):
+    """
+    Try to answer a song without Gemini: a remix whose genre comes straight
+    from the title (or a validated SoundCloud hit) and maps into the energy
+    map doesn't need the model at all. Returns a response block in the same
+    "Is Remix:/Genre:/..." format the rest of the pipeline parses, or None
+    when the song still needs the API (originals, vague genres, unknown
+    energy - Gemini may know a better genre than we can derive locally).
+    """
+    if not features["remix_hint"]:
+        return None  # originals rely on Gemini's knowledge of the source song
+
+    genre = features["title_genre"]
+    if not genre:
+        remixer = features["remixer"]
+        if not remixer:
+            return None
+        sc_result = sc_results.get((title, remixer))
+        if not sc_result:
+            return None
+        sc_genre, sc_artist = sc_result
+
+        # Same remixer-vs-SoundCloud-artist validation process_song applies
+        sc_artist_lower = sc_artist.lower() if sc_artist else ""
+        if not any(kw in sc_artist_lower for kw in remixer.lower().split() if len(kw) > 2):
+            return None
+        genre = sc_genre
+
+    validated = validate_genre(genre, title, artist)
+    if not validated:
+        return None
+    normalized = normalize_genre_case(validated)
+
+    rating = determine_energy_rating(normalized, energy_index)
+    if rating is None:
+        return None  # genre outside the energy map - let Gemini try
+
+    situation = "Club" if rating >= 4 else "Bar" if rating <= 2 else "Both"
+    # Artists/year are left empty when unknown so apply_metadata's truthiness
+    # guards skip them - a placeholder would overwrite the file's existing
+    # TPE1/TDRC frames
+    return "\n".join([
+        "Is Remix: Yes",
+        f"Genre: {normalized}",
+        f"Original Artists: {artist or ''}",
+        "Original Song Release: ",
+        f"Situation: {situation}",
+        "Commercial Friendly: ",
+    ])
+
+def process_song(full_path, title, artist, response, features, energy_index,
+                 unknown_genres, db, rekordbox_enabled, track_by_path,
+                 sc_results=None):
+    """
+    Run the full pipeline for one song given its Gemini response block: genre
+    resolution (title > SoundCloud > Gemini), validation, ID3 metadata write
+    and Rekordbox tagging. Returns (info, rating) when the song was tagged,
+    or None if it was skipped (invalid/unknown genre - will reprocess later).
+    """
+    info = parse_response(response)
+    is_remix = info.get("is_remix", False)
+
+    # Trust an unambiguous title over the model: "(X Remix)" / "Y Edit" etc.
+    # means the remix pipeline (title/SoundCloud genre) should run regardless
+    if not is_remix and features["remix_hint"]:
+        is_remix = True
+        info["is_remix"] = True
+        logger.info("  🔁 Remix keyword in title - treating as remix")
+
+    # Store original Gemini genre as fallback
+    gemini_genre = info.get("genre", "")
+
+    # Only check SoundCloud if it's a REMIX (remixes should use remixer's genre tags)
+    # Original songs should keep their original genre from Gemini
+    if is_remix:
+        # PRIORITY 1: Check if genre is explicitly in the remix title
+        title_genre = features["title_genre"]
+        if title_genre:
+            info["genre"] = title_genre
+            logger.info("  🎵 Genre found in title: %s", title_genre)
+        # PRIORITY 2: Query SoundCloud for remixer's genre
+        elif soundcloud_enabled:
+            try:
+                # For remixes, use the REMIXER name from the title features (e.g.,
+                # "Song (Ale Lucchi Remix)" -> "Ale Lucchi") - more accurate than
+                # the original artist
+                remixer = features["remixer"]
+
+                if remixer:
+                    logger.info("  🎧 Detected remixer: %s", remixer)
+                    # Prefetched concurrently with the rest of the batch when possible
+                    if sc_results is not None and (title, remixer) in sc_results:
+                        sc_result = sc_results[(title, remixer)]
+                    else:
+                        sc_result = lookup_soundcloud_genre(title, remixer)
+
+                    if sc_result:
+                        sc_genre, sc_artist = sc_result
+
+                        # Validate: Check if remixer name appears in SoundCloud artist name
+                        remixer_lower = remixer.lower()
+                        sc_artist_lower = sc_artist.lower() if sc_artist else ""
+
+                        # Split remixer name into keywords for matching
+                        remixer_keywords = remixer_lower.split()
+                        # Check if any significant keyword from remixer appears in SC artist
+                        remixer_match = any(kw in sc_artist_lower for kw in remixer_keywords if len(kw) > 2)
+
+                        if remixer_match:
+                            info["genre"] = sc_genre
+                            logger.info("  ✓ Using SoundCloud genre for remix: %s", sc_genre)
+                        else:
+                            logger.warning("  ⚠️ SoundCloud artist mismatch: '%s' ≠ '%s' - using Gemini genre", sc_artist, remixer)
+                else:
+                    logger.info("  ℹ️ Could not extract remixer - using Gemini genre")
+
+            except Exception as e:
+                logger.warning("  ⚠️ SoundCloud error: %s", e)
+    else:
+        logger.info("  ℹ️ Original song - using genre from AI: %s", info.get('genre'))
+
+    # Validate genre to filter out vague terms and artist/remixer names
+    if info.get("genre"):
+        validated_genre = validate_genre(info["genre"], title, artist)
+        if not validated_genre:
+            # Current genre was too vague, try fallback to Gemini genre if different
+            if gemini_genre and gemini_genre.lower() != info.get("genre", "").lower():
+                logger.info("  🔄 Falling back to Gemini genre: %s", gemini_genre)
+                validated_genre = validate_genre(gemini_genre, title, artist)
+                if not validated_genre:
+                    # Both genres were too vague, skip this track
+                    logger.warning("  ⚠️ Both SoundCloud and Gemini genres were invalid - skipping")
+                    return None
+                info["genre"] = validated_genre
+            else:
+                # No valid fallback, skip this track
+                return None
+        else:
+            info["genre"] = validated_genre
+
+    # Normalize genre to Title Case for consistency
+    if info.get("genre"):
+        info["genre"] = normalize_genre_case(info["genre"])
+
+    # Append Club to genre if the "Club Mix" pattern was found in the title
+    is_club_mix = features["is_club_mix"]
+    if is_club_mix and info.get("genre"):
+        # Only append if "club" is not already present in the genre
+        if "club" not in info["genre"].lower():
+            info["genre"] = f"{info['genre']} / Club"
+            logger.info("  🎶 Club mix detected - Genre updated to: %s", info['genre'])
+
+    # Append Transition to genre if a BPM pattern was found in the title
+    is_transition = features["is_transition"]
+    if is_transition and info.get("genre"):
+        # Only append if not already present
+        if "transition" not in info["genre"].lower():
+            info["genre"] = f"{info['genre']} / Transition"
+            logger.info("  🔄 Transition track detected - Genre updated to: %s", info['genre'])
+
+    genre = info.get("genre", "").lower()
+    if genre == "unknown" or not genre:
+        logger.warning("  ⚠️ No valid genre found for '%s' - skipping (will reprocess later)", title)
+        return None  # skip if unknown
+
+    rating = apply_metadata(full_path, info, energy_index, unknown_genres)
+
+    # Check if rating was determined (None means genre not in energy map or mashup)
+    # Mashups are allowed (valid genre but no rating due to varying energy)
+    is_mashup = "mashup" in genre
+
+    if rating is None and not is_mashup:
+        # Genre not found in energy map - this is an unknown/invalid genre
+        logger.warning("  ⚠️ Unknown genre for '%s': '%s' - not found in energy map", title, info.get('genre'))
+        logger.warning("     Skipping Rekordbox tagging and not marking as processed (will reprocess later)")
+        return None  # Skip this track entirely - don't tag or mark as processed
+
+    # Tag in Rekordbox if database is available
+    if rekordbox_enabled and db:
+        try:
+            tag_rekordbox(full_path, title, info.get("situation", ""), info.get("genre", ""), rating, info.get("commercial", ""), is_transition, db, track_by_path)
+            # Commits happen in batches in the main loop (BATCH_COMMIT_SIZE)
+        except Exception as e:
+            logger.warning("  ⚠️ Failed to tag in Rekordbox: %s", e)
+            # Don't skip - still save to processed_songs if ID3 tagging succeeded
+
+    return info, rating
+
 # -------------------- MAIN --------------------
 def main():
     # Check if Rekordbox is running FIRST before any processing
@@ -712,9 +1567,10 @@ def main():
     try:
         db_test = Rekordbox6Database()
         # If we get here, check if Rekordbox is actually running
-        # Try a simple operation to see if database is locked
+        # A trivial SELECT shows whether the database is locked without
+        # materializing the whole content table like get_content() would
         try:
-            test_content = list(db_test.get_content())[:1]
+            db_test.session.execute(text("SELECT 1")).scalar()
             db_test.close()
         except Exception as e:
             db_test.close()
@@ -729,39 +1585,60 @@ def main():
     print("✓ Rekordbox check passed\n")
     
     energy_map = load_json(ENERGY_MAP_PATH)
-    processed_songs = load_json(PROCESSED_SONGS_PATH)
-    unknown_genres = []
-    missing_title_files = []
-    failed_files = []  # Track files that failed after all retries
+    genre_matcher = build_genre_matcher(energy_map)
+    energy_index = build_energy_index(energy_map)
+    build_genre_canon(energy_map)
+    processed_songs = load_processed_songs()
+
+    # Path -> fingerprint for entries recorded with stat info; unchanged files
+    # are then skipped on a stat() alone, without reopening them
+    known_fingerprints = {
+        entry["path"]: entry
+        for entry in processed_songs.values()
+        if isinstance(entry, dict) and "path" in entry
+    }
+    gemini_cache = load_json(GEMINI_CACHE_PATH)
+    unknown_genres = IssueLog()
+    missing_title_files = IssueLog()
+    failed_files = IssueLog()  # Track files that failed after all retries
 
     # First pass: collect files that need processing
     files_to_process = []
-    low_bitrate_files = []
+    low_bitrate_files = IssueLog()
+    already_processed = 0
 
-    for root, _, files in os.walk(MUSIC_DIR):
-        for file in files:
-            if not file.lower().endswith(".mp3"):
-                continue
+    # MP3 header reads release the GIL during file I/O, so a thread pool
+    # overlaps disk latency across many files instead of reading serially.
+    # Walking from the absolute root means every yielded path is already
+    # absolute, so no per-track abspath (getcwd syscall) is needed later.
+    mp3_paths = list(iter_mp3_files(os.path.abspath(MUSIC_DIR)))
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        scan_results = list(executor.map(
+            functools.partial(scan_mp3_file, fingerprints=known_fingerprints),
+            mp3_paths))
 
-            full_path = os.path.join(root, file)
-            bitrate = get_bitrate(full_path)
-            if bitrate < BITRATE_MIN:
-                low_bitrate_files.append((file, bitrate))
-                continue
+    for full_path, (bitrate, title, artist) in zip(mp3_paths, scan_results):
+        if bitrate is None:
+            # Fingerprint matched a previous run - never even opened
+            already_processed += 1
+            continue
 
-            # Retrieve title from ID3 tag
-            try:
-                audio = EasyID3(full_path)
-                title_list = audio.get("title")
-                if title_list:
-                    title = title_list[0]
-                    # Skip already processed
-                    if title not in processed_songs:
-                        files_to_process.append((full_path, title))
-                else:
-                    missing_title_files.append(file)
-            except Exception as e:
-                missing_title_files.append(file)
+        file = os.path.basename(full_path)
+        if bitrate < BITRATE_MIN:
+            low_bitrate_files.append((file, bitrate))
+            continue
+
+        if title:
+            # Skip already processed
+            if title not in processed_songs:
+                files_to_process.append((full_path, title, artist))
+            else:
+                already_processed += 1
+        else:
+            missing_title_files.append(file)
+
+    if already_processed:
+        print(f"⏭️ Skipping {already_processed} already-processed file(s)")
     
     # If no files to process, exit early
     if not files_to_process:
@@ -791,6 +1668,7 @@ def main():
     try:
         db = Rekordbox6Database()
         rekordbox_enabled = True
+        tune_rekordbox_sqlite(db)
         print("✓ Rekordbox database connection established\n")
     except Exception as e:
         print(f"⚠️ Rekordbox database unavailable: {e}")
@@ -798,184 +1676,158 @@ def main():
         rekordbox_enabled = False
         db = None
 
-    # Start persistent chat session (NEW API)
-    chat = client.chats.create(model="gemini-2.5-flash-lite")
-    
-    # Send initial prompt with retry logic
-    for attempt in range(MAX_RETRIES):
+    # Preload the track index so each song is an O(1) dict lookup instead of a DB search
+    track_by_path = {}
+    if rekordbox_enabled and db:
         try:
-            chat.send_message(PROMPT_INSTRUCTIONS)
-            break  # Success, exit retry loop
+            track_by_path = build_track_index(db)
+            preload_tag_caches(db)
+            print(f"✓ Indexed {len(track_by_path)} Rekordbox track(s) by path\n")
         except Exception as e:
-            error_str = str(e)
-            
-            # Check if it's a quota exhaustion error (429 RESOURCE_EXHAUSTED)
-            if "429" in error_str and "RESOURCE_EXHAUSTED" in error_str:
-                # Try to parse the retry delay from the error message
-                retry_delay = 60  # Default to 60 seconds
-                
-                # Look for retryDelay in the error (format: 'retryDelay': '3s' or 'retryDelay': '3.423771862s')
-                retry_match = re.search(r"'retryDelay':\s*'([\d.]+)s'", error_str)
-                if retry_match:
-                    # Parse as float and round up to nearest second
-                    retry_delay = int(float(retry_match.group(1))) + 1
-                
-                if attempt < MAX_RETRIES - 1:  # Don't retry on last attempt
-                    print(f"⏳ Quota exhausted during initialization. Waiting {retry_delay} seconds before retry (attempt {attempt + 1}/{MAX_RETRIES})...")
-                    time.sleep(retry_delay)
-                    continue  # Retry the request
-                else:
-                    print(f"❌ Failed to initialize chat after {MAX_RETRIES} attempts: {e}")
-                    print("   Please wait for quota reset and try again later.")
-                    return
-            else:
-                # For other errors, print and exit
-                print(f"❌ Failed to initialize chat: {e}")
-                return
+            print(f"⚠️ Failed to index Rekordbox tracks: {e}\n")
+
+    # Start persistent chat session (NEW API)
+    chat = create_chat()
+    if chat is None:
+        return
 
     try:
-        for idx, (full_path, title) in enumerate(tqdm(files_to_process, desc="Processing files")):
-            # Add delay between requests to respect rate limits (skip for first request)
-            if idx > 0:
-                time.sleep(API_DELAY_SECONDS)
-            
-            # Extract artist from metadata for better genre accuracy
-            artist = get_artist_from_file(full_path)
-            
-            # Query Google AI for metadata first (include artist if available)
-            response = query_google_ai(title, chat, artist)
-            if not response:
-                failed_files.append((title, "API query failed after all retries"))
-                continue
+        pending_commits = 0
+        last_commit_time = time.monotonic()
+        with tqdm(total=len(files_to_process), desc="Processing files") as progress:
+            for batch_start in range(0, len(files_to_process), GEMINI_BATCH_SIZE):
+                batch = files_to_process[batch_start:batch_start + GEMINI_BATCH_SIZE]
 
-            info = parse_response(response)
-            is_remix = info.get("is_remix", False)
-            
-            # Store original Gemini genre as fallback
-            gemini_genre = info.get("genre", "")
-            
-            # Only check SoundCloud if it's a REMIX (remixes should use remixer's genre tags)
-            # Original songs should keep their original genre from Gemini
-            if is_remix:
-                # PRIORITY 1: Check if genre is explicitly in the remix title
-                title_genre = extract_genre_from_remix_title(title, energy_map)
-                if title_genre:
-                    info["genre"] = title_genre
-                    print(f"  🎵 Genre found in title: {title_genre}")
-                # PRIORITY 2: Query SoundCloud for remixer's genre
-                elif soundcloud_enabled:
-                    try:
-                        # For remixes, extract REMIXER name from title (e.g., "Song (Ale Lucchi Remix)" -> "Ale Lucchi")
-                        # This is more accurate than using the original artist
-                        remixer = extract_remixer_from_title(title)
-                        
-                        if remixer:
-                            print(f"  🎧 Detected remixer: {remixer}")
-                            sc_result = asyncio.run(query_soundcloud_genre(title, remixer))
-                            
-                            if sc_result:
-                                sc_genre, sc_artist = sc_result
-                                
-                                # Validate: Check if remixer name appears in SoundCloud artist name
-                                remixer_lower = remixer.lower()
-                                sc_artist_lower = sc_artist.lower() if sc_artist else ""
-                                
-                                # Split remixer name into keywords for matching
-                                remixer_keywords = remixer_lower.split()
-                                # Check if any significant keyword from remixer appears in SC artist
-                                remixer_match = any(kw in sc_artist_lower for kw in remixer_keywords if len(kw) > 2)
-                                
-                                if remixer_match:
-                                    info["genre"] = sc_genre
-                                    print(f"  ✓ Using SoundCloud genre for remix: {sc_genre}")
-                                else:
-                                    print(f"  ⚠️ SoundCloud artist mismatch: '{sc_artist}' ≠ '{remixer}' - using Gemini genre")
-                        else:
-                            print(f"  ℹ️ Could not extract remixer - using Gemini genre")
-                            
-                    except Exception as e:
-                        print(f"  ⚠️ SoundCloud error: {e}")
-            else:
-                print(f"  ℹ️ Original song - using genre from AI: {info.get('genre')}")
-            
-            # Validate genre to filter out vague terms and artist/remixer names
-            if info.get("genre"):
-                validated_genre = validate_genre(info["genre"], title, artist)
-                if not validated_genre:
-                    # Current genre was too vague, try fallback to Gemini genre if different
-                    if gemini_genre and gemini_genre.lower() != info.get("genre", "").lower():
-                        print(f"  🔄 Falling back to Gemini genre: {gemini_genre}")
-                        validated_genre = validate_genre(gemini_genre, title, artist)
-                        if not validated_genre:
-                            # Both genres were too vague, skip this track
-                            print(f"  ⚠️ Both SoundCloud and Gemini genres were invalid - skipping")
-                            continue
-                        info["genre"] = validated_genre
+                # Artists were read during the scan pass - no extra file opens here
+                songs = [(title, artist) for _, title, artist in batch]
+
+                # Parse each title once; local resolution, the SoundCloud
+                # pre-pass and process_song all read from the feature dicts
+                features_list = [parse_title_features(title, genre_matcher)
+                                 for _, title, _ in batch]
+
+                # Serve previously-seen songs from the on-disk cache; only songs
+                # without a cached response block go out to the API
+                cache_keys = [gemini_cache_key(title, artist) for title, artist in songs]
+                blocks = [gemini_cache.get(key) for key in cache_keys]
+
+                query_failed = set()
+                uncached = [i for i, block in enumerate(blocks) if block is None]
+
+                # Short-circuit Gemini for remixes we can resolve locally:
+                # genre from the title or a validated SoundCloud hit, with
+                # situation derived from the energy map
+                if uncached:
+                    local_lookups = []
+                    if soundcloud_enabled:
+                        local_lookups = [(batch[i][1], features_list[i]["remixer"])
+                                         for i in uncached
+                                         if features_list[i]["remix_hint"]
+                                         and features_list[i]["remixer"]
+                                         and not features_list[i]["title_genre"]]
+                    local_sc = gather_soundcloud_results(local_lookups)
+                    for i in list(uncached):
+                        block = build_local_block(batch[i][1], batch[i][2],
+                                                  features_list[i], local_sc, energy_index)
+                        if block:
+                            blocks[i] = block
+                            uncached.remove(i)
+                            logger.info("  ⚡ '%s' resolved locally - skipping Gemini", batch[i][1])
+
+                # The same track in several folders shares one slot in the
+                # request - only the first copy of each cache key is queried
+                seen_keys = set()
+                deduped = []
+                for i in uncached:
+                    if cache_keys[i] not in seen_keys:
+                        seen_keys.add(cache_keys[i])
+                        deduped.append(i)
+
+                if deduped:
+                    # Rate limiting happens inside query_google_ai: it waits for
+                    # the shared request deadline, so fully-cached batches and
+                    # per-song work never pay an artificial delay
+                    response = query_google_ai([songs[i] for i in deduped], chat)
+                    if response:
+                        for i, block in zip(deduped, split_batch_response(response, len(deduped))):
+                            if block:
+                                blocks[i] = block
+                                gemini_cache[cache_keys[i]] = block
+                        save_json(GEMINI_CACHE_PATH, gemini_cache)
+                        # Duplicate copies pick up the block fetched for their twin
+                        for i in uncached:
+                            if blocks[i] is None:
+                                blocks[i] = gemini_cache.get(cache_keys[i])
                     else:
-                        # No valid fallback, skip this track
+                        query_failed.update(uncached)
+
+                # Overlap the batch's SoundCloud round-trips: remixes whose genre
+                # isn't already in the title get their lookups gathered up front
+                sc_lookups = []
+                if soundcloud_enabled:
+                    for (full_path, title, _), block, feats in zip(batch, blocks, features_list):
+                        if not block:
+                            continue
+                        if not (parse_response(block).get("is_remix") or feats["remix_hint"]):
+                            continue
+                        if feats["title_genre"]:
+                            continue  # title already names the genre
+                        if feats["remixer"]:
+                            sc_lookups.append((title, feats["remixer"]))
+                sc_results = gather_soundcloud_results(sc_lookups)
+
+                for position, ((full_path, title, artist), block, feats) in enumerate(zip(batch, blocks, features_list)):
+                    progress.update(1)
+
+                    if not block:
+                        if position in query_failed:
+                            failed_files.append((title, "API query failed after all retries"))
+                        else:
+                            failed_files.append((title, "Song missing from batched response"))
                         continue
-                else:
-                    info["genre"] = validated_genre
-            
-            # Normalize genre to Title Case for consistency
-            if info.get("genre"):
-                info["genre"] = normalize_genre_case(info["genre"])
-            
-            # Detect and append Club to genre if "Club Mix" pattern found in title
-            is_club_mix = detect_club_mix(title)
-            if is_club_mix and info.get("genre"):
-                # Only append if "club" is not already present in the genre
-                if "club" not in info["genre"].lower():
-                    info["genre"] = f"{info['genre']} / Club"
-                    print(f"  🎶 Club mix detected - Genre updated to: {info['genre']}")
-            
-            # Detect and append Transition to genre if BPM pattern found
-            is_transition = detect_transition(title)
-            if is_transition and info.get("genre"):
-                # Only append if not already present
-                if "transition" not in info["genre"].lower():
-                    info["genre"] = f"{info['genre']} / Transition"
-                    print(f"  🔄 Transition track detected - Genre updated to: {info['genre']}")
-            
-            genre = info.get("genre", "").lower()
-            if genre == "unknown" or not genre:
-                print(f"  ⚠️ No valid genre found for '{title}' - skipping (will reprocess later)")
-                continue  # skip if unknown
 
-            rating = apply_metadata(full_path, info, energy_map, unknown_genres)
-            
-            # Check if rating was determined (None means genre not in energy map or mashup)
-            # Mashups are allowed (valid genre but no rating due to varying energy)
-            is_mashup = "mashup" in genre
-            
-            if rating is None and not is_mashup:
-                # Genre not found in energy map - this is an unknown/invalid genre
-                print(f"  ⚠️ Unknown genre for '{title}': '{info.get('genre')}' - not found in energy map")
-                print(f"     Skipping Rekordbox tagging and not marking as processed (will reprocess later)")
-                continue  # Skip this track entirely - don't tag or mark as processed
-            
-            # Tag in Rekordbox if database is available
-            if rekordbox_enabled and db:
-                try:
-                    tag_rekordbox(full_path, title, info.get("situation", ""), info.get("genre", ""), rating, info.get("commercial", ""), is_transition, db)
-                    # Commit to database immediately after tagging
-                    db.commit()
-                except Exception as e:
-                    print(f"  ⚠️ Failed to tag/commit to Rekordbox: {e}")
-                    # Don't skip - still save to processed_songs if ID3 tagging succeeded
+                    result = process_song(full_path, title, artist, block, feats,
+                                          energy_index, unknown_genres, db, rekordbox_enabled,
+                                          track_by_path, sc_results)
+                    if result is None:
+                        continue  # skipped - will reprocess on next run
 
-            # Only mark as processed if genre was valid
-            processed_songs[title] = True
-            
-            # Save processed_songs.json immediately after each successful song
-            save_json(PROCESSED_SONGS_PATH, processed_songs)
+                    info, rating = result
 
-            commercial_status = f"\n  Commercial: {info.get('commercial')}" if info.get('commercial') else ""
-            remix_status = " [REMIX]" if info.get('is_remix') else " [ORIGINAL]"
-            rating_display = rating if rating is not None else "N/A (Mashup)"
-            print(f"\n✅ Tagged: {title}{remix_status}\n  Genre: {info.get('genre')}\n  Rating: {rating_display}\n  Situation: {info.get('situation')}{commercial_status}")
+                    # Commit Rekordbox writes in batches to amortize SQLite fsync
+                    # cost; the time trigger bounds how much work a crash can lose
+                    # when cache misses make progress slow
+                    if rekordbox_enabled and db:
+                        pending_commits += 1
+                        if (pending_commits >= BATCH_COMMIT_SIZE
+                                or time.monotonic() - last_commit_time > COMMIT_INTERVAL_SECONDS):
+                            db.commit()
+                            pending_commits = 0
+                            last_commit_time = time.monotonic()
 
-        # Final commit (safety - individual commits already done per song)
+                    # Only mark as processed if genre was valid; the stat
+                    # fingerprint lets the next run skip this file unopened
+                    try:
+                        st = os.stat(full_path)
+                        entry = {"path": full_path, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+                    except OSError:
+                        entry = True
+                    processed_songs[title] = entry
+
+                    # Log progress immediately after each successful song -
+                    # appending one line instead of rewriting the whole dict
+                    append_processed_song(title, entry)
+
+                    # Bind fields once instead of repeated info.get() in the format path
+                    genre_v = info.get('genre')
+                    situation_v = info.get('situation')
+                    commercial_v = info.get('commercial')
+                    commercial_status = f"\n  Commercial: {commercial_v}" if commercial_v else ""
+                    remix_status = " [REMIX]" if info.get('is_remix') else " [ORIGINAL]"
+                    rating_display = rating if rating is not None else "N/A (Mashup)"
+                    logger.info("\n✅ Tagged: %s%s\n  Genre: %s\n  Rating: %s\n  Situation: %s%s", title, remix_status, genre_v, rating_display, situation_v, commercial_status)
+
+        # Final commit flushes the tail of the last batch
         if rekordbox_enabled and db:
             try:
                 db.commit()
@@ -992,7 +1844,12 @@ def main():
             db.close()
             print("✓ Rekordbox database connection closed")
 
-    # Note: processed_songs.json is saved after each song, no final save needed
+        # Release the shared SoundCloud HTTP session and its event loop
+        close_soundcloud_session()
+
+        # Fold the per-song log back into the compact JSON file
+        compact_processed_songs(processed_songs)
+
     print(f"✓ All progress saved to {PROCESSED_SONGS_PATH}")
 
     # Print summary of issues/warnings
@@ -1005,17 +1862,23 @@ def main():
         print(f"\n❌ Files failed after retries: {len(failed_files)}")
         for title, reason in failed_files:
             print(f"  - {title} → {reason}")
+        if failed_files.overflow:
+            print(f"  ... and {failed_files.overflow} more")
         print(f"\n💡 Tip: Wait for quota reset and run the script again to process failed files.")
 
     if low_bitrate_files:
         print(f"\n⚠️ Files skipped (low bitrate < {BITRATE_MIN/1000:.0f} kbps): {len(low_bitrate_files)}")
         for file, bitrate in low_bitrate_files:
             print(f"  - {file}: {bitrate/1000:.1f} kbps")
+        if low_bitrate_files.overflow:
+            print(f"  ... and {low_bitrate_files.overflow} more")
 
     if missing_title_files:
         print(f"\n⚠️ Files missing title metadata: {len(missing_title_files)}")
         for f in missing_title_files:
             print(f"  - {f}")
+        if missing_title_files.overflow:
+            print(f"  ... and {missing_title_files.overflow} more")
 
     if unknown_genres:
         print(f"\n⚠️ Songs with unknown/invalid genres (NOT PROCESSED): {len(unknown_genres)}")
@@ -1023,6 +1886,8 @@ def main():
         print(f"   They will be reprocessed on the next run.")
         for title, genre in unknown_genres:
             print(f"  - {title} → {genre}")
+        if unknown_genres.overflow:
+            print(f"  ... and {unknown_genres.overflow} more")
         print(f"\n💡 Tip: Add these genres to energy_map.json or update the AI prompt to get more specific genres.")
 
 if __name__ == "__main__":